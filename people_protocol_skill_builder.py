@@ -12,16 +12,46 @@ Setup:
    export ANTHROPIC_API_KEY="your_anthropic_key"
 
 2. Install dependencies:
-   pip install requests anthropic
+   pip install -r requirements.txt
 
 3. Run:
    python people_protocol_skill_builder.py
+
+   Or run a whole selection without prompts from a JSON/YAML config:
+   python people_protocol_skill_builder.py --config skills.yaml --non-interactive
 """
 
 import os
-import json
+import sys
+import argparse
+import asyncio
+import time
+import sqlite3
+import hashlib
+import functools
+import threading
+import httpx
+import ijson
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from anthropic import Anthropic
+from anthropic.types.message_create_params import MessageCreateParamsNonStreaming
+from anthropic.types.messages.batch_create_params import Request
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # the semantic cache is optional
+    SentenceTransformer = None
+
+try:
+    import yaml
+except ImportError:  # YAML configs are optional; JSON always works
+    yaml = None
 
 # =============================================================================
 # CONFIGURATION
@@ -34,64 +64,77 @@ ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
 LIGHTCAST_AUTH_URL = "https://auth.emsicloud.com/connect/token"
 LIGHTCAST_SKILLS_URL = "https://emsiservices.com/skills/versions/latest/skills"
 LIGHTCAST_VERSIONS_URL = "https://emsiservices.com/skills/versions/latest"
+LIGHTCAST_IDS_PER_REQUEST = 50
 
-OUTPUT_FILE = "people_protocol_skills.json"
-
-# =============================================================================
-# TRANSFORMATION PROMPT
-# =============================================================================
+# Transient Lightcast failures are retried with exponential backoff
+LIGHTCAST_MAX_RETRIES = 3
+LIGHTCAST_BACKOFF_FACTOR = 0.3
+LIGHTCAST_RETRY_STATUSES = (429, 500, 502, 503, 504)
 
-TRANSFORMATION_PROMPT = """You are transforming skills into the People Protocol framework format.
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
 
-## What is a Skill?
+OUTPUT_FILE = "people_protocol_skills.json"
 
-Skills are technical and functional competencies required for a role. They are NOT:
-- Behaviors/Values (universal organizational attributes)
-- Deliverables (output metrics like speed, quality)
-- Personality traits (abstract characteristics)
+# Lightcast tokens last about an hour; reuse them across runs until shortly
+# before they expire.
+TOKEN_CACHE_FILE = os.path.expanduser("~/.cache/pp_skill_builder_token.json")
+TOKEN_EXPIRY_MARGIN = 60
 
-Skills provide clear roadmaps for growth, objective recruitment criteria, and standardized expectations.
+# Transformations are cached on disk so re-running over overlapping skill
+# selections does not call Claude again.
+CACHE_DB = os.environ.get("PP_CACHE_DB", os.path.expanduser("~/.cache/pp_skill_builder.db"))
 
-## The Five Proficiency Levels
+# Opt-in semantic cache: reuse a previous transformation when a new skill's
+# name and description embed almost identically to one already transformed
+# (e.g. "Python (Programming Language)" vs "Python Programming").
+# Requires `pip install sentence-transformers`.
+SEMANTIC_CACHE_ENABLED = os.environ.get("PP_SEMANTIC_CACHE") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("PP_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_CACHE_PATH = os.path.splitext(CACHE_DB)[0] + "_semantic"
 
-Each skill uses a consistent five-level scale that builds cumulatively. An employee at "Advanced" has demonstrated all behaviors at Poor (absence of), Basic, and Intermediate levels.
+# Number of skills transformed concurrently. Lower this if you hit
+# Anthropic rate limits.
+TRANSFORM_MAX_WORKERS = int(os.environ.get("PP_TRANSFORM_WORKERS", "8"))
 
-| Level | Label | Definition |
-|-------|-------|------------|
-| 1 | **Poor** | Red flag behaviors—no employee should exhibit these. Indicates fundamental gaps or negative impact. |
-| 2 | **Basic** | Minimum acceptable standard. Foundational competency expected of entry-level employees. |
-| 3 | **Intermediate** | Solid proficiency. Independent execution with reliability on complex tasks. |
-| 4 | **Advanced** | High mastery. Strategic application, innovation, and ability to handle novel situations. |
-| 5 | **Exceptional** | World-class. Industry-leading expertise that only the very best demonstrate. |
+# Selections larger than this go through the Message Batches API, which is
+# cheaper per token but adds minutes of queueing latency.
+BATCH_THRESHOLD = int(os.environ.get("PP_BATCH_THRESHOLD", "50"))
+BATCH_POLL_INTERVAL = 10
 
-## Observable Statement Requirements
+# Attempts per skill; failed validations are fed back to Claude. Rate limits
+# and server errors are already retried with backoff by the Anthropic client.
+TRANSFORM_MAX_ATTEMPTS = 3
 
-Each statement must be:
-- **Observable**: Based on actions a manager can witness, not internal states
-- **Specific**: Describes concrete behaviors, not vague qualities
-- **Binary**: Can be answered Yes or No without ambiguity
-- **Action-oriented**: Uses verbs that describe what someone does
-- **Level-appropriate**: Complexity matches the proficiency level
+# =============================================================================
+# TRANSFORMATION PROMPTS
+# =============================================================================
 
-**Good examples**: "Delivers tasks on time", "Identifies errors in seemingly correct statements by applying critical thinking", "Breaks down simple problems based on data and resolves them"
+# The rubric is sent as the system prompt on every call, so it is kept to the
+# schema and the hard rules. The longer worked examples are only added to the
+# user message when a first attempt fails validation.
 
-**Bad examples**: "Has good time management", "Thinks critically", "Is pretty good at problem-solving"
+SYSTEM_RUBRIC = """You transform skills into the People Protocol framework: observable behavioral statements across five cumulative proficiency levels. Managers score from Poor upwards and stop at the first "No".
 
-## Statement Quantity Per Level
+Levels and statement counts:
+- poor: red-flag behaviors no employee should exhibit (2-5)
+- basic: minimum acceptable standard for entry-level employees (2-4)
+- intermediate: reliable, independent execution on complex tasks (2-4)
+- advanced: strategic mastery, innovation, developing others (2-5)
+- exceptional: industry-leading expertise, top 1-5% (2-3)
 
-**CRITICAL - MANDATORY REQUIREMENT**: Each level MUST have EXACTLY 2 or more statements. There should NEVER be 0 or 1 statement for any level. This is a hard requirement that cannot be violated.
+Rules:
+- Every level MUST have at least 2 statements. Responses with fewer are rejected.
+- Each statement is observable, specific and answerable Yes/No by a manager. Start with an action verb and avoid subjective qualifiers (good, excellent).
+- No duplicate statements across levels. Complexity increases clearly from poor to exceptional.
 
-- **Poor**: 2–5 statements (define clear "red lines") - **MUST HAVE AT LEAST 2, NEVER 0 OR 1**
-- **Basic**: 2–4 statements (core foundational behaviors) - **MUST HAVE AT LEAST 2, NEVER 0 OR 1**
-- **Intermediate**: 2–4 statements (solid independent performance) - **MUST HAVE AT LEAST 2, NEVER 0 OR 1**
-- **Advanced**: 2–5 statements (multiple aspects of mastery) - **MUST HAVE AT LEAST 2, NEVER 0 OR 1**
-- **Exceptional**: 2–3 statements (rare, distinctive achievements) - **MUST HAVE AT LEAST 2, NEVER 0 OR 1**
+Return the result by calling the emit_skill tool, with the original Lightcast ID and a one-line description."""
 
-**Total per skill**: 10–21 observable statements (minimum 10: 2 per level × 5 levels).
+EXAMPLES_BLOCK = """## Examples
 
-**VALIDATION**: Your response will be rejected if ANY level has fewer than 2 statements. Ensure every level has at least 2 statements before returning your response.
+**Good statements**: "Delivers tasks on time", "Identifies errors in seemingly correct statements by applying critical thinking", "Breaks down simple problems based on data and resolves them"
 
-## Statement Writing Patterns by Level
+**Bad statements**: "Has good time management", "Thinks critically", "Is pretty good at problem-solving"
 
 **Poor Level** (what NOT to do):
 - "Demonstrates unstructured [skill], fails to [expected outcome]"
@@ -123,77 +166,201 @@ Each statement must be:
 - "Recognized externally as an authority in [skill area]"
 - "Redefines [industry/field] standards and expectations"
 
-## Scorecard Mechanics
-
-Managers assess skills by reviewing each statement starting from Poor, marking "Yes" or "No" based on observed behavior, and stopping at the first "No" response. The employee's level is the highest level where all statements are "Yes".
-
-**Critical**: Earlier statements (Poor, Basic) must be absolute prerequisites. A "No" at Basic means the employee scores Poor, regardless of advanced capabilities.
+Every level must have at least 2 statements."""
 
-## Quality Checklist
+LEVELS = ["poor", "basic", "intermediate", "advanced", "exceptional"]
 
-Before generating statements, ensure:
-- All statements are observable (manager can answer Yes/No)
-- Each statement is distinct (no duplicates across levels)
-- Poor level describes genuinely problematic behaviors
-- Basic level is achievable by entry-level employees
-- Exceptional level is genuinely rare (top 1–5%)
-- Statements use action verbs (demonstrates, delivers, identifies, creates)
-- Statements avoid subjective qualifiers (good, bad, excellent)
-- Progression from Poor → Exceptional shows clear capability increase
-
-## Output Format
-
-Return ONLY valid JSON in this exact structure (no markdown, no explanation):
+# Claude is forced to answer through this tool, so the transformed skill comes
+# back as a structured object rather than free text that needs parsing.
+TRANSFORMATION_TOOL = {
+    "name": "emit_skill",
+    "description": "Emit the transformed skill in People Protocol format.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "description": {"type": "string", "description": "One-line definition"},
+            "lightcast_id": {"type": "string"},
+            "levels": {
+                "type": "object",
+                "properties": {
+                    level: {"type": "array", "items": {"type": "string"}, "minItems": 2}
+                    for level in LEVELS
+                },
+                "required": LEVELS
+            }
+        },
+        "required": ["name", "description", "lightcast_id", "levels"]
+    }
+}
+TRANSFORMATION_TOOL_CHOICE = {"type": "tool", "name": TRANSFORMATION_TOOL["name"]}
 
-{{
-  "name": "Skill Name",
-  "description": "One-line definition",
-  "lightcast_id": "original_id",
-  "levels": {{
-    "poor": ["statement 1", "statement 2"],
-    "basic": ["statement 1", "statement 2"],
-    "intermediate": ["statement 1", "statement 2"],
-    "advanced": ["statement 1", "statement 2", "statement 3"],
-    "exceptional": ["statement 1", "statement 2"]
-  }}
-}}
+# Static prompt parts are marked for Anthropic prompt caching. The tools plus
+# rubric prefix of a first attempt (~750 tokens) is below Sonnet's 1024-token
+# minimum, so it is sent uncached; only the retry prefix, which adds
+# EXAMPLES_BLOCK, is long enough to be cached and shared between retries.
+SYSTEM_BLOCKS = [
+    {"type": "text", "text": SYSTEM_RUBRIC, "cache_control": {"type": "ephemeral"}}
+]
 
-## Skill to Transform
+SKILL_PROMPT = """Transform this skill:
 
 Name: {skill_name}
 Description: {skill_description}
-Lightcast ID: {skill_id}
+Lightcast ID: {skill_id}"""
 
-Return ONLY the JSON object, nothing else."""
+# SKILL_PROMPT is rendered once per skill, so split it around its placeholders
+# up front and build prompts by concatenation instead of str.format.
+_PROMPT_PREFIX, _rest = SKILL_PROMPT.split("{skill_name}", 1)
+_PROMPT_MID1, _rest = _rest.split("{skill_description}", 1)
+_PROMPT_MID2, _PROMPT_SUFFIX = _rest.split("{skill_id}", 1)
+del _rest
 
 # =============================================================================
 # LIGHTCAST API FUNCTIONS
 # =============================================================================
 
-def get_lightcast_token():
-    """Authenticate with Lightcast and get access token."""
+def load_cached_token():
+    """Return a previously saved Lightcast token if it is still valid for the current client."""
+    try:
+        with open(TOKEN_CACHE_FILE, "rb") as f:
+            cached = orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("client_id") != LIGHTCAST_CLIENT_ID:
+        return None
+    expires_at = cached.get("expires_at")
+    if isinstance(expires_at, (int, float)) and time.time() + TOKEN_EXPIRY_MARGIN < expires_at:
+        return cached.get("access_token")
+    return None
+
+
+def save_cached_token(access_token, expires_at):
+    """Save a Lightcast token to disk, readable only by the current user."""
+    os.makedirs(os.path.dirname(TOKEN_CACHE_FILE), exist_ok=True)
+    fd = os.open(TOKEN_CACHE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(orjson.dumps({
+            "client_id": LIGHTCAST_CLIENT_ID,
+            "access_token": access_token,
+            "expires_at": expires_at
+        }))
+    os.chmod(TOKEN_CACHE_FILE, 0o600)
+
+
+# Pooled session for the OAuth endpoint, so auth retries reuse the connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(
+        total=LIGHTCAST_MAX_RETRIES,
+        backoff_factor=LIGHTCAST_BACKOFF_FACTOR,
+        status_forcelist=LIGHTCAST_RETRY_STATUSES,
+        allowed_methods=None  # the token request is a POST
+    )
+))
+
+
+def get_lightcast_token(force_refresh=False):
+    """Authenticate with Lightcast and get access token, reusing a cached one if valid."""
+    token = None if force_refresh else load_cached_token()
+    if token:
+        return token
+    
     data = {
         "client_id": LIGHTCAST_CLIENT_ID,
         "client_secret": LIGHTCAST_CLIENT_SECRET,
         "grant_type": "client_credentials",
         "scope": "emsi_open"
     }
-    response = requests.post(LIGHTCAST_AUTH_URL, data=data)
+    response = _SESSION.post(LIGHTCAST_AUTH_URL, data=data)
     response.raise_for_status()
-    return response.json()["access_token"]
+    payload = orjson.loads(response.content)
+    token = payload["access_token"]
+    try:
+        save_cached_token(token, time.time() + payload.get("expires_in", 3600))
+    except OSError:
+        pass  # caching is best-effort
+    return token
 
 
-def get_skill_types(token):
-    """Get available skill types from Lightcast."""
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(LIGHTCAST_VERSIONS_URL, headers=headers)
+# All Lightcast calls share one event loop so the pooled HTTP/2 connections
+# held by the client stay usable between menu actions.
+_loop = asyncio.new_event_loop()
+
+# Created on first use so it belongs to _loop
+_token_lock = None
+
+
+def run_sync(coro):
+    """Run a Lightcast coroutine to completion from synchronous code."""
+    return _loop.run_until_complete(coro)
+
+
+def create_lightcast_client(token):
+    """Create the pooled HTTP/2 client used for all Lightcast requests."""
+    # The transport retries failed connection attempts; lightcast_request
+    # handles retryable status codes
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=32),
+        retries=LIGHTCAST_MAX_RETRIES
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=30.0
+    )
+
+
+async def refresh_lightcast_token(client, stale_auth):
+    """Re-authenticate after a 401 and update the client's Authorization header.
+
+    Concurrent requests that were rejected with the same token share a
+    single refresh.
+    """
+    global _token_lock
+    if _token_lock is None:
+        _token_lock = asyncio.Lock()
+    async with _token_lock:
+        if client.headers.get("Authorization") != stale_auth:
+            return  # another request already refreshed it
+        token = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(get_lightcast_token, force_refresh=True)
+        )
+        client.headers["Authorization"] = f"Bearer {token}"
+
+
+async def lightcast_request(client, method, url, **kwargs):
+    """Send a Lightcast request, backing off on rate limits and server errors.
+
+    An expired token (401) is refreshed once and the request retried.
+    """
+    refreshed = False
+    attempt = 0
+    while True:
+        auth = client.headers.get("Authorization")
+        response = await client.request(method, url, **kwargs)
+        if response.status_code == 401 and not refreshed:
+            await refresh_lightcast_token(client, auth)
+            refreshed = True
+            continue
+        if response.status_code not in LIGHTCAST_RETRY_STATUSES or attempt == LIGHTCAST_MAX_RETRIES:
+            break
+        await asyncio.sleep(LIGHTCAST_BACKOFF_FACTOR * 2 ** attempt)
+        attempt += 1
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
+
 
+async def get_skill_types(client):
+    """Get available skill types from Lightcast."""
+    return await lightcast_request(client, "GET", LIGHTCAST_VERSIONS_URL)
 
-def search_skills(token, query=None, type_ids=None, limit=50):
+
+async def search_skills(client, query=None, type_ids=None, limit=50):
     """Search/list skills from Lightcast."""
-    headers = {"Authorization": f"Bearer {token}"}
     params = {
         "fields": "id,name,type,description,infoUrl",
         "limit": limit
@@ -203,60 +370,313 @@ def search_skills(token, query=None, type_ids=None, limit=50):
     if type_ids:
         params["typeIds"] = type_ids
     
-    response = requests.get(LIGHTCAST_SKILLS_URL, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json().get("data", [])
+    data = await lightcast_request(client, "GET", LIGHTCAST_SKILLS_URL, params=params)
+    return data.get("data", [])
 
 
-def get_skill_by_id(token, skill_id):
+async def get_skill_by_id(client, skill_id):
     """Get a specific skill by ID."""
-    headers = {"Authorization": f"Bearer {token}"}
-    url = f"https://emsiservices.com/skills/versions/latest/skills/{skill_id}"
     params = {"fields": "id,name,type,description,infoUrl"}
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    return response.json().get("data")
+    data = await lightcast_request(client, "GET", f"{LIGHTCAST_SKILLS_URL}/{skill_id}", params=params)
+    return data.get("data")
+
+
+async def get_skills_by_ids(client, skill_ids):
+    """Fetch several skills by ID using Lightcast's bulk lookup.
+
+    IDs are sent in chunks of LIGHTCAST_IDS_PER_REQUEST, with the chunks
+    fetched concurrently. Results come back in the order requested; unknown
+    IDs are dropped.
+    """
+    async def fetch(chunk):
+        data = await lightcast_request(
+            client, "POST", LIGHTCAST_SKILLS_URL,
+            params={"fields": "id,name,type,description,infoUrl"},
+            json={"ids": chunk}
+        )
+        return data.get("data", [])
+    
+    chunks = [
+        skill_ids[i:i + LIGHTCAST_IDS_PER_REQUEST]
+        for i in range(0, len(skill_ids), LIGHTCAST_IDS_PER_REQUEST)
+    ]
+    found = {}
+    for skills in await asyncio.gather(*[fetch(chunk) for chunk in chunks]):
+        found.update((skill["id"], skill) for skill in skills)
+    return [found[sid] for sid in skill_ids if sid in found]
+
+
+# =============================================================================
+# TRANSFORMATION CACHE
+# =============================================================================
+
+_cache_lock = threading.Lock()
+
+
+def _cache_connect():
+    """Open the cache database, creating it if needed."""
+    cache_dir = os.path.dirname(CACHE_DB)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    conn = sqlite3.connect(CACHE_DB)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS transformations "
+        "(key TEXT PRIMARY KEY, skill_id TEXT, json TEXT)"
+    )
+    return conn
+
+
+def cache_fingerprint():
+    """Hash everything besides the skill that shapes a transformation.
+
+    Changing the model, rubric or tool schema changes the fingerprint, which
+    invalidates entries in both caches.
+    """
+    tool = orjson.dumps(TRANSFORMATION_TOOL, option=orjson.OPT_SORT_KEYS).decode()
+    return hashlib.sha256(f"{CLAUDE_MODEL}\n{SYSTEM_RUBRIC}\n{tool}".encode()).hexdigest()
+
+
+CACHE_FINGERPRINT = cache_fingerprint()
+
+
+def cache_key(prompt):
+    """Hash a prompt together with the cache fingerprint."""
+    return hashlib.sha256(f"{CACHE_FINGERPRINT}\n{prompt}".encode()).hexdigest()
+
+
+def cache_get(key):
+    """Return the cached transformation for a key, or None (also if the cache is unusable)."""
+    try:
+        with _cache_lock, closing(_cache_connect()) as conn:
+            row = conn.execute("SELECT json FROM transformations WHERE key = ?", (key,)).fetchone()
+        return orjson.loads(row[0]) if row else None
+    except (sqlite3.Error, OSError, ValueError):
+        return None  # caching is best-effort
+
+
+def cache_put(key, skill_id, result):
+    """Store a transformation in the cache, ignoring failures."""
+    try:
+        with _cache_lock, closing(_cache_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transformations (key, skill_id, json) VALUES (?, ?, ?)",
+                (key, skill_id, orjson.dumps(result).decode())
+            )
+    except (sqlite3.Error, OSError):
+        pass  # caching is best-effort
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of transformations over local skill embeddings.
+
+    Embeddings are appended to a raw float32 file and memory-mapped on load,
+    so startup cost does not grow with the cache. Results are stored one JSON
+    object per line in a sidecar file, in the same order as the embeddings.
+    If a write was interrupted, both files are cut back to the entries they
+    have in common before the cache is used.
+    """
+
+    def __init__(self, path, threshold=SEMANTIC_CACHE_THRESHOLD):
+        self.embeddings_path = path + ".f32"
+        self.results_path = path + ".jsonl"
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._model = None
+        self._matrix = None
+        self._reconciled = False
+        self._rewrite_results = False
+        self._results = []
+        if os.path.exists(self.results_path):
+            with open(self.results_path, "rb") as f:
+                for line in f:
+                    try:
+                        self._results.append(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        # A torn write; drop it and everything after it
+                        self._rewrite_results = True
+                        break
+
+    def _encode(self, skill):
+        if self._model is None:
+            self._model = SentenceTransformer(SEMANTIC_CACHE_MODEL)
+        text = f"{skill.get('name', '')} {skill.get('description') or ''}"
+        return self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+    def _reconcile(self, dim):
+        """Truncate both files to the number of complete, paired entries."""
+        if self._reconciled:
+            return
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        size = os.path.getsize(self.embeddings_path) if os.path.exists(self.embeddings_path) else 0
+        count = min(size // row_bytes, len(self._results))
+        if size != count * row_bytes:
+            with open(self.embeddings_path, "r+b") as f:
+                f.truncate(count * row_bytes)
+        if len(self._results) != count or self._rewrite_results:
+            self._results = self._results[:count]
+            with open(self.results_path, "wb") as f:
+                f.writelines(orjson.dumps(entry) + b"\n" for entry in self._results)
+        self._reconciled = True
+        self._rewrite_results = False
+
+    def _load_matrix(self, dim):
+        self._reconcile(dim)
+        if self._matrix is None and self._results:
+            matrix = np.memmap(self.embeddings_path, dtype=np.float32, mode="r")
+            self._matrix = matrix.reshape(-1, dim)
+        return self._matrix
+
+    def get(self, skill):
+        """Return a transformation for a near-duplicate skill, or None."""
+        with self._lock:
+            emb = self._encode(skill)
+            matrix = self._load_matrix(emb.shape[0])
+            if matrix is None:
+                return None
+            scores = np.dot(matrix, emb)
+            for i in np.argsort(scores)[::-1]:
+                if scores[i] < self.threshold:
+                    return None
+                entry = self._results[i]
+                if entry.get("fingerprint") == CACHE_FINGERPRINT:
+                    break
+            else:
+                return None
+        result = dict(entry["result"])
+        result["name"] = skill.get("name", result.get("name"))
+        result["lightcast_id"] = skill.get("id", result.get("lightcast_id"))
+        return result
+
+    def put(self, skill, result):
+        """Record a transformation for future near-duplicate lookups."""
+        with self._lock:
+            emb = self._encode(skill)
+            cache_dir = os.path.dirname(self.results_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self._reconcile(emb.shape[0])
+            entry = {"fingerprint": CACHE_FINGERPRINT, "result": result}
+            self._matrix = None
+            try:
+                with open(self.embeddings_path, "ab") as f:
+                    f.write(emb.tobytes())
+                with open(self.results_path, "ab") as f:
+                    f.write(orjson.dumps(entry) + b"\n")
+            except OSError:
+                # Repair both files before the next read or write
+                self._reconciled = False
+                self._rewrite_results = True
+                raise
+            self._results.append(entry)
+
+
+_semantic_cache = (
+    SemanticCache(SEMANTIC_CACHE_PATH)
+    if SEMANTIC_CACHE_ENABLED and SentenceTransformer is not None
+    else None
+)
+
+
+def lookup_transformation(key, skill):
+    """Look a skill up in the exact cache, then the semantic cache."""
+    result = cache_get(key)
+    if result is None and _semantic_cache is not None:
+        try:
+            result = _semantic_cache.get(skill)
+        except (OSError, ValueError):
+            pass  # caching is best-effort
+    return result
+
+
+def store_transformation(key, skill, result):
+    """Record a fresh transformation in every enabled cache."""
+    cache_put(key, skill.get("id"), result)
+    if _semantic_cache is not None:
+        try:
+            _semantic_cache.put(skill, result)
+        except OSError:
+            pass  # caching is best-effort
+
+
+def cached_transformation(func):
+    """Serve transform_skill results from the on-disk caches when possible."""
+    @functools.wraps(func)
+    def wrapper(client, skill):
+        key = cache_key(build_prompt(skill))
+        result = lookup_transformation(key, skill)
+        if result is None:
+            result = func(client, skill)
+            store_transformation(key, skill, result)
+        return result
+    return wrapper
 
 
 # =============================================================================
 # CLAUDE API FUNCTIONS
 # =============================================================================
 
-def transform_skill(client, skill):
-    """Transform a Lightcast skill into People Protocol format using Claude."""
-    prompt = TRANSFORMATION_PROMPT.format(
-        skill_name=skill.get("name", ""),
-        skill_description=skill.get("description", "No description available"),
-        skill_id=skill.get("id", "")
+def build_prompt(skill):
+    """Render the user prompt for a Lightcast skill."""
+    return (
+        _PROMPT_PREFIX + str(skill.get("name", ""))
+        + _PROMPT_MID1 + str(skill.get("description", "No description available"))
+        + _PROMPT_MID2 + str(skill.get("id", ""))
+        + _PROMPT_SUFFIX
     )
-    
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=1500,
-        messages=[{"role": "user", "content": prompt}]
+
+
+def build_content(skill):
+    """Build the user message content blocks for a skill."""
+    return [{"type": "text", "text": build_prompt(skill)}]
+
+
+def append_feedback(messages, error):
+    """Add a failed attempt's error to the request so Claude can regenerate.
+
+    The worked examples are included with the first round of feedback only.
+    """
+    content = messages[0]["content"]
+    if not any(block["text"] == EXAMPLES_BLOCK for block in content):
+        content.insert(0, {"type": "text", "text": EXAMPLES_BLOCK, "cache_control": {"type": "ephemeral"}})
+    content.append({"type": "text", "text": f"A previous attempt failed: {error} Regenerate."})
+
+
+def check_streamed_levels(events, counts):
+    """Fail fast on parser events from a streamed response.
+
+    Raises ValueError as soon as a level's statement array closes with fewer
+    than 2 statements, so a bad generation can be abandoned early.
+    """
+    for prefix, event, _ in events:
+        parts = prefix.split(".")
+        if len(parts) == 3 and parts[0] == "levels" and parts[2] == "item" and event == "string":
+            counts[parts[1]] = counts.get(parts[1], 0) + 1
+        elif len(parts) == 2 and parts[0] == "levels" and event == "end_array":
+            if parts[1] in LEVELS and counts.get(parts[1], 0) < 2:
+                raise ValueError(
+                    f'Invalid skill transformation: Level "{parts[1]}" must have at least 2 statements, '
+                    f'but found {counts.get(parts[1], 0)}. Please regenerate with at least 2 statements per level.'
+                )
+
+
+def extract_transformation(message):
+    """Return the validated skill from Claude's emit_skill tool call.
+
+    The tool's input schema already asks for 2+ statements per level, but
+    the API does not strictly enforce it, so the minimum is re-checked here.
+    """
+    result = next(
+        (block.input for block in message.content
+         if block.type == "tool_use" and block.name == TRANSFORMATION_TOOL["name"]),
+        None
     )
-    
-    response_text = message.content[0].text.strip()
-    
-    # Parse JSON response
-    try:
-        result = json.loads(response_text)
-    except json.JSONDecodeError:
-        # Try to extract JSON if wrapped in markdown
-        if "```json" in response_text:
-            json_str = response_text.split("```json")[1].split("```")[0].strip()
-            result = json.loads(json_str)
-        elif "```" in response_text:
-            json_str = response_text.split("```")[1].split("```")[0].strip()
-            result = json.loads(json_str)
-        else:
-            raise
+    if not isinstance(result, dict):
+        raise ValueError(f"Invalid skill transformation: no {TRANSFORMATION_TOOL['name']} tool call in response.")
     
     # Validate minimum 2 statements per level
-    levels = ["poor", "basic", "intermediate", "advanced", "exceptional"]
     validation_errors = []
     
-    for level in levels:
+    for level in LEVELS:
         statements = result.get("levels", {}).get(level, [])
         if not isinstance(statements, list) or len(statements) < 2:
             validation_errors.append(
@@ -270,6 +690,157 @@ def transform_skill(client, skill):
     return result
 
 
+def stream_transformation(client, messages):
+    """Stream one transformation from Claude and return the validated result."""
+    counts = {}
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events)
+    
+    # Feed the tool input through an incremental parser as it streams; leaving
+    # the block early (on a validation error) closes the stream and stops
+    # generation.
+    with client.messages.stream(
+        model=CLAUDE_MODEL,
+        max_tokens=1500,
+        system=SYSTEM_BLOCKS,
+        tools=[TRANSFORMATION_TOOL],
+        tool_choice=TRANSFORMATION_TOOL_CHOICE,
+        messages=messages
+    ) as stream:
+        for event in stream:
+            if event.type != "input_json" or parser is None:
+                continue
+            if not event.partial_json:
+                # The first tool_use delta is empty, and ijson reads b"" as end of input
+                continue
+            try:
+                parser.send(event.partial_json.encode())
+            except ijson.JSONError:
+                # Leave malformed input to the final validation
+                parser = None
+                continue
+            check_streamed_levels(events, counts)
+            del events[:]
+        message = stream.get_final_message()
+    
+    return extract_transformation(message)
+
+
+def transform_with_retries(client, skill, failed=None):
+    """Transform a skill, feeding validation failures back to Claude for another attempt.
+
+    If `failed` is a validation error from an earlier attempt (e.g. a batch
+    result), the first request already includes that feedback.
+    """
+    messages = [{"role": "user", "content": build_content(skill)}]
+    if failed is not None:
+        append_feedback(messages, failed)
+    
+    for attempt in range(TRANSFORM_MAX_ATTEMPTS):
+        try:
+            return stream_transformation(client, messages)
+        except ValueError as e:
+            if attempt == TRANSFORM_MAX_ATTEMPTS - 1:
+                raise
+            append_feedback(messages, e)
+
+
+@cached_transformation
+def transform_skill(client, skill):
+    """Transform a Lightcast skill into People Protocol format using Claude."""
+    return transform_with_retries(client, skill)
+
+
+def transform_skills(client, skills, max_workers=TRANSFORM_MAX_WORKERS):
+    """Transform skills concurrently, yielding (index, skill, result, error) as each finishes."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(transform_skill, client, skill): i for i, skill in enumerate(skills)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                yield i, skills[i], future.result(), None
+            except Exception as e:
+                yield i, skills[i], None, e
+
+
+def transform_skills_batch(client, skills):
+    """Transform skills via the Message Batches API, yielding (index, skill, result, error).
+
+    The batch is processed server-side at a discount, so this suits larger
+    selections where a few minutes of queueing is acceptable.
+    """
+    keys = {}
+    batch_requests = []
+    for i, skill in enumerate(skills):
+        keys[i] = cache_key(build_prompt(skill))
+        cached = lookup_transformation(keys[i], skill)
+        if cached is not None:
+            yield i, skill, cached, None
+            continue
+        # Index-based ids keep custom_id unique even if a skill was selected twice
+        batch_requests.append(Request(
+            custom_id=f"skill-{i}",
+            params=MessageCreateParamsNonStreaming(
+                model=CLAUDE_MODEL,
+                max_tokens=1500,
+                system=SYSTEM_BLOCKS,
+                tools=[TRANSFORMATION_TOOL],
+                tool_choice=TRANSFORMATION_TOOL_CHOICE,
+                messages=[{"role": "user", "content": build_content(skill)}]
+            )
+        ))
+    
+    if not batch_requests:
+        return
+    
+    print(f"Submitting {len(batch_requests)} skills as a message batch; this can take several minutes...\n")
+    batch = client.messages.batches.create(requests=batch_requests)
+    
+    try:
+        while batch.processing_status != "ended":
+            time.sleep(BATCH_POLL_INTERVAL)
+            batch = client.messages.batches.retrieve(batch.id)
+    except BaseException:
+        # Don't leave an abandoned batch running (and billing) on Ctrl-C
+        client.messages.batches.cancel(batch.id)
+        raise
+    
+    # Errored, expired, canceled and invalid entries are retried afterwards
+    # on the thread pool, so a failed batch doesn't become a serial loop
+    retries = []
+    for entry in client.messages.batches.results(batch.id):
+        i = int(entry.custom_id.split("-", 1)[1])
+        skill = skills[i]
+        if entry.result.type != "succeeded":
+            retries.append((i, None))
+            continue
+        try:
+            result = extract_transformation(entry.result.message)
+        except ValueError as e:
+            retries.append((i, e))
+            continue
+        store_transformation(keys[i], skill, result)
+        yield i, skill, result, None
+    
+    if not retries:
+        return
+    
+    with ThreadPoolExecutor(max_workers=TRANSFORM_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(transform_with_retries, client, skills[i], failed=failed): i
+            for i, failed in retries
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                yield i, skills[i], None, e
+                continue
+            store_transformation(keys[i], skills[i], result)
+            yield i, skills[i], result, None
+
+
 # =============================================================================
 # MAIN APPLICATION
 # =============================================================================
@@ -311,36 +882,165 @@ def display_skills(skills):
     print("="*60)
 
 
-def main():
+def load_config(path):
+    """Load a batch-mode config from a JSON or YAML file.
+
+    Recognised keys are `queries`, `type_ids` and `skill_ids` (lists) and an
+    optional per-search `limit`.
+    """
+    with open(path, "rb") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise RuntimeError("YAML configs require PyYAML (pip install pyyaml)")
+            config = yaml.safe_load(f) or {}
+        else:
+            config = orjson.loads(f.read())
+    if not isinstance(config, dict):
+        raise ValueError("config must be a mapping")
+    return config
+
+
+async def collect_config_skills(client, config):
+    """Run every search and ID lookup in a config concurrently, de-duplicating results."""
+    limit = config.get("limit", 50)
+    lookups = [search_skills(client, query=q, limit=limit) for q in config.get("queries", [])]
+    lookups += [search_skills(client, type_ids=t, limit=limit) for t in config.get("type_ids", [])]
+    if config.get("skill_ids"):
+        lookups.append(get_skills_by_ids(client, config["skill_ids"]))
+    
+    skills = {}
+    for results in await asyncio.gather(*lookups):
+        for skill in results:
+            skills.setdefault(skill["id"], skill)
+    return list(skills.values())
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Transform Lightcast skills into the People Protocol format.")
+    parser.add_argument("--config", help="JSON or YAML file listing queries, type_ids and skill_ids to select")
+    parser.add_argument("--non-interactive", action="store_true",
+                        help="transform and export the config's skills without showing the menu")
+    parser.add_argument("--output", default=OUTPUT_FILE, help=f"export path (default: {OUTPUT_FILE})")
+    args = parser.parse_args(argv)
+    if args.non_interactive and not args.config:
+        parser.error("--non-interactive requires --config")
+    return args
+
+
+def export_skills(client, skills, output_file=OUTPUT_FILE):
+    """Transform skills and stream the results into the output file.
+
+    Skills are written in selection order: a result that finishes early is
+    held only until every skill before it has completed. Results are written
+    to a temporary file that replaces output_file only if at least one skill
+    was transformed. Returns the number of skills exported.
+    """
+    if len(skills) > BATCH_THRESHOLD:
+        completed = transform_skills_batch(client, skills)
+    else:
+        completed = transform_skills(client, skills)
+    
+    tmp_file = f"{output_file}.tmp"
+    exported = 0
+    pending = {}
+    next_index = 0
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(b'{\n  "framework": "People Protocol",\n  "version": "1.0",\n  "skills": [')
+            for done, (index, skill, result, error) in enumerate(completed, 1):
+                if error is None:
+                    print(f"[{done}/{len(skills)}] {skill['name']} ✓")
+                else:
+                    print(f"[{done}/{len(skills)}] {skill['name']} ✗ ({error})")
+                pending[index] = result
+                while next_index in pending:
+                    result = pending.pop(next_index)
+                    next_index += 1
+                    if result is None:
+                        continue
+                    f.write(b",\n    " if exported else b"\n    ")
+                    # Indent the whole object to sit inside the "skills" array
+                    f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n    "))
+                    exported += 1
+            f.write(b"\n  ]\n}" if exported else b"]\n}")
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+    
+    if exported:
+        os.replace(tmp_file, output_file)
+    else:
+        os.remove(tmp_file)
+    return exported
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
     print("\n" + "="*60)
     print("  PEOPLE PROTOCOL SKILL BUILDER")
     print("="*60)
     
     # Check credentials
     if not check_credentials():
-        return
+        return 1
     
     # Initialize clients
     print("\nConnecting to Lightcast...")
     try:
         token = get_lightcast_token()
+        lightcast = create_lightcast_client(token)
         print("✓ Lightcast authenticated")
     except Exception as e:
         print(f"✗ Lightcast authentication failed: {e}")
-        return
+        return 1
     
     print("Connecting to Claude...")
     try:
         claude = Anthropic(api_key=ANTHROPIC_API_KEY)
         print("✓ Claude ready")
+        if SEMANTIC_CACHE_ENABLED and SentenceTransformer is None:
+            print("Warning: PP_SEMANTIC_CACHE=1 but sentence-transformers is not installed; semantic cache disabled")
     except Exception as e:
         print(f"✗ Claude initialization failed: {e}")
-        return
+        run_sync(lightcast.aclose())
+        return 1
+    
+    selected_skills = []
+    
+    if args.config:
+        print(f"\nCollecting skills from {args.config}...")
+        try:
+            selected_skills = run_sync(collect_config_skills(lightcast, load_config(args.config)))
+            print(f"✓ {len(selected_skills)} skills selected")
+        except Exception as e:
+            print(f"✗ Could not collect skills from config: {e}")
+            run_sync(lightcast.aclose())
+            return 1
+    
+    if args.non_interactive:
+        try:
+            if not selected_skills:
+                print("\nNo skills matched the config")
+                return 1
+            print(f"\nTransforming {len(selected_skills)} skills...\n")
+            exported = export_skills(claude, selected_skills, args.output)
+        except Exception as e:
+            print(f"\nTransform failed: {e}")
+            return 1
+        finally:
+            run_sync(lightcast.aclose())
+        if not exported:
+            print("\nNo skills were successfully transformed")
+            return 1
+        print(f"\n✓ Exported {exported} of {len(selected_skills)} skills to {args.output}")
+        return 0
     
     # Get skill types
     print("\nFetching skill types...")
     try:
-        version_info = get_skill_types(token)
+        version_info = run_sync(get_skill_types(lightcast))
         types = version_info.get("attributions", {}).get("types", [])
         print("\nAvailable skill types:")
         for t in types:
@@ -350,8 +1050,16 @@ def main():
         types = []
     
     # Main loop
-    selected_skills = []
-    
+    try:
+        interactive_menu(claude, lightcast, types, selected_skills, args.output)
+    except (EOFError, KeyboardInterrupt):
+        print("\nGoodbye!")
+    finally:
+        run_sync(lightcast.aclose())
+
+
+def interactive_menu(claude, lightcast, types, selected_skills, output_file):
+    """Run the interactive search/select/transform menu until the user exits."""
     while True:
         print("\n" + "-"*60)
         print("OPTIONS:")
@@ -360,16 +1068,17 @@ def main():
         print("  3. View selected skills")
         print("  4. Transform selected skills and export")
         print("  5. Exit")
+        print("  6. Add skills by Lightcast ID")
         print("-"*60)
         
-        choice = input("\nChoice (1-5): ").strip()
+        choice = input("\nChoice (1-6): ").strip()
         
         if choice == "1":
             query = input("Search keyword: ").strip()
             if query:
                 print(f"\nSearching for '{query}'...")
                 try:
-                    skills = search_skills(token, query=query, limit=20)
+                    skills = run_sync(search_skills(lightcast, query=query, limit=20))
                     if skills:
                         display_skills(skills)
                         selection = input("Enter numbers to select (e.g., 1,3,5) or 'all': ").strip()
@@ -399,7 +1108,7 @@ def main():
                 type_id = types[int(type_choice)-1]["id"]
                 print(f"\nFetching {type_id} skills...")
                 try:
-                    skills = search_skills(token, type_ids=type_id, limit=30)
+                    skills = run_sync(search_skills(lightcast, type_ids=type_id, limit=30))
                     if skills:
                         display_skills(skills)
                         selection = input("Enter numbers to select (e.g., 1,3,5) or 'all': ").strip()
@@ -443,27 +1152,13 @@ def main():
             print(f"\nTransforming {len(selected_skills)} skills...")
             print("This may take a moment...\n")
             
-            transformed = []
-            for i, skill in enumerate(selected_skills, 1):
-                print(f"[{i}/{len(selected_skills)}] {skill['name']}...", end=" ", flush=True)
-                try:
-                    result = transform_skill(claude, skill)
-                    transformed.append(result)
-                    print("✓")
-                except Exception as e:
-                    print(f"✗ ({e})")
-            
-            if transformed:
-                output = {
-                    "framework": "People Protocol",
-                    "version": "1.0",
-                    "skills": transformed
-                }
-                
-                with open(OUTPUT_FILE, "w") as f:
-                    json.dump(output, f, indent=2)
-                
-                print(f"\n✓ Exported {len(transformed)} skills to {OUTPUT_FILE}")
+            try:
+                exported = export_skills(claude, selected_skills, output_file)
+            except Exception as e:
+                print(f"\nTransform failed: {e}")
+                continue
+            if exported:
+                print(f"\n✓ Exported {exported} skills to {output_file}")
             else:
                 print("\nNo skills were successfully transformed")
         
@@ -471,9 +1166,24 @@ def main():
             print("\nGoodbye!")
             break
         
+        elif choice == "6":
+            entry = input("Skill IDs (comma-separated): ").strip()
+            skill_ids = [x.strip() for x in entry.split(",") if x.strip()]
+            if skill_ids:
+                print(f"\nFetching {len(skill_ids)} skills...")
+                try:
+                    skills = run_sync(get_skills_by_ids(lightcast, skill_ids))
+                    selected_skills.extend(skills)
+                    for skill in skills:
+                        print(f"Added: {skill['name']}")
+                    if len(skills) < len(skill_ids):
+                        print(f"{len(skill_ids) - len(skills)} IDs not found")
+                except Exception as e:
+                    print(f"Lookup failed: {e}")
+        
         else:
             print("Invalid choice")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())